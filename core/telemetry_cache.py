@@ -0,0 +1,127 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.telemetry_loader import COMPOUNDS, DriverTrace, load_race_telemetry
+
+CACHE_DIR = ".telemetry-cache"
+
+# Per-sample DriverTrace columns stored as-is (sectors are split into s1/s2/s3)
+SAMPLE_COLUMNS = ["xs", "ys", "times", "speeds", "gears", "drs",
+                  "tyres", "distances", "lap_numbers", "pit_status"]
+
+
+def cache_path(year: int, round_number: int) -> str:
+    return os.path.join(CACHE_DIR, f"{year}_{round_number}.parquet")
+
+
+# ============================================================
+# Write: DriverTrace dict -> one Parquet table
+# ============================================================
+
+def save_telemetry(path: str, telemetry: Dict[str, DriverTrace]) -> None:
+    traces = list(telemetry.values())
+
+    columns = {
+        "driver_code": np.concatenate([np.full(len(tr.times), tr.driver_code) for tr in traces]),
+    }
+    for name in SAMPLE_COLUMNS:
+        columns[name] = np.concatenate([getattr(tr, name) for tr in traces])
+    for i, name in enumerate(("s1", "s2", "s3")):
+        columns[name] = np.concatenate([tr.sectors[:, i] for tr in traces])
+
+    # Row range of every driver, so readers can slice without a group-by
+    offsets = np.cumsum([0] + [len(tr.times) for tr in traces])
+    drivers = [[tr.driver_code, int(start), int(end - start)]
+               for tr, start, end in zip(traces, offsets[:-1], offsets[1:])]
+
+    table = pa.Table.from_pydict(columns)
+    table = table.replace_schema_metadata({"drivers": json.dumps(drivers)})
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(
+        table,
+        path,
+        compression="zstd",
+        use_dictionary=["driver_code", "tyres", "pit_status"],
+    )
+
+
+# ============================================================
+# Read: Parquet table -> DriverTrace dict
+# ============================================================
+
+class DriverTraceLazy(DriverTrace):
+    """
+    DriverTrace backed by one driver's slice of the cached Arrow
+    table. Each column is converted to NumPy on first access
+    (zero-copy for numeric columns), so callers only pay for what they read.
+    """
+
+    def __init__(self, driver_code: str, table: pa.Table):
+        self.driver_code = driver_code
+        self.compound_lookup = COMPOUNDS
+        self._table = table
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if name == "sectors":
+            value = np.stack([self._column(n) for n in ("s1", "s2", "s3")], axis=1)
+        elif name in SAMPLE_COLUMNS:
+            value = self._column(name)
+        else:
+            raise AttributeError(name)
+
+        setattr(self, name, value)
+        return value
+
+    def _column(self, name: str) -> np.ndarray:
+        if name not in self._table.column_names:
+            raise AttributeError(f"column {name!r} was not read from the cache")
+
+        column = self._table.column(name)
+        chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        return chunk.to_numpy(zero_copy_only=False)
+
+
+def read_telemetry(path: str, columns: Optional[List[str]] = None) -> Dict[str, DriverTraceLazy]:
+    """
+    Memory-maps the Parquet cache and reads only `columns` (DriverTrace
+    field names; all of them when None).
+    """
+    names = None
+    if columns is not None:
+        names = []
+        for name in columns:
+            names.extend(("s1", "s2", "s3") if name == "sectors" else (name,))
+
+    source = pa.memory_map(path, "r")
+    table = pq.read_table(source, columns=names, use_threads=True)
+    drivers = json.loads(table.schema.metadata[b"drivers"])
+
+    return {
+        code: DriverTraceLazy(code, table.slice(start, length))
+        for code, start, length in drivers
+    }
+
+
+def load_or_build(year: int, round_number: int, columns: Optional[List[str]] = None) -> Dict[str, DriverTrace]:
+    """
+    Returns the race telemetry for (year, round_number), reading the
+    Parquet cache when present and building + caching it otherwise.
+    On a cache hit only `columns` are read from disk.
+    """
+    path = cache_path(year, round_number)
+    if os.path.exists(path):
+        return read_telemetry(path, columns)
+
+    telemetry = load_race_telemetry(year, round_number)
+    if telemetry:
+        save_telemetry(path, telemetry)
+    return telemetry
@@ -1,171 +1,240 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, Optional
 
 import fastf1
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def rolling_stationary_mask_np(x: np.ndarray, window: int, thresh: float) -> np.ndarray:
+    """NumPy version of telemetry_numba.rolling_stationary_mask."""
+    if len(x) == 0:
+        return np.zeros(0, dtype=bool)
+    # row i is x[i - window:i], left-padded with x[0]
+    win = sliding_window_view(np.pad(x, (window, 0), mode="edge"), window)[:len(x)]
+    mask = (win.max(axis=1) - win.min(axis=1)) < thresh
+    mask[:1] = False  # no history before the first sample
+    return mask
+
+
+def cumulative_distance_np(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """NumPy version of telemetry_numba.cumulative_distance."""
+    # accumulate in float64 like the kernel, whatever the input dtype
+    steps = np.hypot(np.diff(x), np.diff(y)).astype(np.float64)
+    return np.concatenate(([0.0], np.cumsum(steps)))[:len(x)]
+
+
+try:
+    from core.telemetry_numba import cumulative_distance, rolling_stationary_mask
+except ImportError:  # numba is optional
+    cumulative_distance = cumulative_distance_np
+    rolling_stationary_mask = rolling_stationary_mask_np
+
+
+# Tyre compounds as stored on DriverTrace.tyres (int8 index into this tuple)
+COMPOUNDS = ("SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET", "UNKNOWN")
+UNKNOWN_COMPOUND = COMPOUNDS.index("UNKNOWN")
+
+# Pit states as stored on DriverTrace.pit_status (int8 index into this tuple)
+PIT_STATUSES = ("", "PIT", "OUT")
+ON_TRACK, IN_PIT, RETIRED = range(len(PIT_STATUSES))
 
 
 @dataclass
 class DriverTrace:
     driver_code: str
-    positions: List[Tuple[float, float]]
-    times: List[float]
-    speeds: List[float]
-    gears: List[int]
-    drs: List[int]
-    tyres: List[str]
-    distances: List[float]
-    sectors: List[tuple]  # (S1, S2, S3)
-    lap_numbers: List[int]
-    pit_status: List[str]   # "PIT", "OUT", or ""
+    xs: np.ndarray
+    ys: np.ndarray
+    times: np.ndarray
+    speeds: np.ndarray
+    gears: np.ndarray
+    drs: np.ndarray
+    tyres: np.ndarray          # int8 compound codes, see compound_lookup
+    distances: np.ndarray
+    sectors: np.ndarray        # shape (N, 3): S1, S2, S3
+    lap_numbers: np.ndarray
+    pit_status: np.ndarray     # int8 codes into PIT_STATUSES
+    compound_lookup: tuple = COMPOUNDS
+    t0: float = 0.0            # time of sample 0 on a uniform grid, see resample_uniform
+    rate: float = 0.0          # grid rate in Hz; 0 when samples are irregular
+
+    @property
+    def tyres_str(self) -> np.ndarray:
+        return np.asarray(self.compound_lookup)[self.tyres]
+
+    @property
+    def pit_status_str(self) -> np.ndarray:
+        return np.asarray(PIT_STATUSES)[self.pit_status]
+
+
+def encode_categories(values, categories, default: int) -> np.ndarray:
+    """int8 category codes for `values`; anything not in `categories` maps to `default`."""
+    codes = pd.Categorical(values, categories=categories).codes.astype(np.int8)
+    codes[codes < 0] = default
+    return codes
+
+
+def encode_compounds(compounds) -> np.ndarray:
+    return encode_categories(compounds, COMPOUNDS, UNKNOWN_COMPOUND)
+
+
+def resample_uniform(tr: DriverTrace, rate: float) -> DriverTrace:
+    """
+    Resamples `tr` onto the shared time lattice k / rate (seconds), so the
+    sample at time t is simply int(t * rate) - t0 * rate for every driver.
+    Continuous columns are interpolated linearly; categorical ones take the
+    latest original sample at or before each grid time.
+    """
+    times = tr.times.astype(np.float64)
+    k0 = int(np.ceil(times[0] * rate))
+    k1 = max(k0, int(np.floor(times[-1] * rate)))
+    grid = np.arange(k0, k1 + 1) / rate
+
+    prev = np.searchsorted(times, grid, side="right") - 1
+
+    def lerp(values):
+        return np.interp(grid, times, values.astype(np.float64)).astype(values.dtype)
+
+    return DriverTrace(
+        driver_code=tr.driver_code,
+        xs=lerp(tr.xs),
+        ys=lerp(tr.ys),
+        times=grid.astype(tr.times.dtype),
+        speeds=lerp(tr.speeds),
+        gears=tr.gears[prev],
+        drs=tr.drs[prev],
+        tyres=tr.tyres[prev],
+        distances=lerp(tr.distances),
+        sectors=tr.sectors[prev],
+        lap_numbers=tr.lap_numbers[prev],
+        pit_status=tr.pit_status[prev],
+        compound_lookup=tr.compound_lookup,
+        t0=k0 / rate,
+        rate=rate,
+    )
+
+
+def _process_driver(drv, session, laps) -> Optional[DriverTrace]:
+    # Use get_telemetry() to get all data, including distance
+    telemetry_data = laps.get_telemetry()
+
+    if telemetry_data.empty:
+        return None
+
+    session_times = telemetry_data["SessionTime"]
+    t0 = session_times.iloc[0]
+    times_sec = (session_times - t0).dt.total_seconds().to_numpy()
+
+    speeds = telemetry_data["Speed"].fillna(0).to_numpy()
+    distances = telemetry_data["Distance"].fillna(0).to_numpy()
+    gears = telemetry_data["nGear"].fillna(0).astype(int).to_numpy() if "nGear" in telemetry_data else np.zeros(
+        len(session_times), dtype=int)
+    drs = telemetry_data["DRS"].fillna(0).astype(int).to_numpy() if "DRS" in telemetry_data else np.zeros(len(session_times),
+                                                                                                         dtype=int)
+
+    # --------------------------------------
+    # LAP INDEX PER TELEMETRY SAMPLE
+    # --------------------------------------
+
+    # One binary search over the lap start times gives, for every sample,
+    # the position of the latest lap whose LapStartTime is <= timestamp
+    # (-1 before the first lap starts).
+    lap_start_ns = laps["LapStartTime"].to_numpy(dtype="timedelta64[ns]").view("i8")
+    sample_ns = session_times.to_numpy(dtype="timedelta64[ns]").view("i8")
+    lap_idx = np.searchsorted(lap_start_ns, sample_ns, side="right") - 1
+    before_first_lap = lap_idx < 0
+    lap_pos = lap_idx.clip(0)
+
+    # --------------------------------------
+    # TYRE COMPOUND PER TELEMETRY SAMPLE
+    # --------------------------------------
+
+    compound_arr = encode_compounds(laps["Compound"])
+    tyre_series = np.where(before_first_lap, UNKNOWN_COMPOUND, compound_arr[lap_pos]).astype(np.int8)
+
+    # --------------------------------------
+    # LAP NUMBER + SECTOR TIMES PER SAMPLE
+    # --------------------------------------
+
+    lapnum_arr = laps["LapNumber"].fillna(0).astype(int).to_numpy()
+    lap_numbers_list = np.where(before_first_lap, 0, lapnum_arr[lap_pos])
+
+    # Sector times as seconds (float), 0 where FastF1 has no timing
+    s1_arr = laps["Sector1Time"].dt.total_seconds().fillna(0).to_numpy()
+    s2_arr = laps["Sector2Time"].dt.total_seconds().fillna(0).to_numpy()
+    s3_arr = laps["Sector3Time"].dt.total_seconds().fillna(0).to_numpy()
+
+    s1 = np.where(before_first_lap, 0, s1_arr[lap_pos])
+    s2 = np.where(before_first_lap, 0, s2_arr[lap_pos])
+    s3 = np.where(before_first_lap, 0, s3_arr[lap_pos])
+    sectors_list = np.stack([s1, s2, s3], axis=1).astype(np.float32)
+
+    # -------------------------------------------------
+    # PIT STATUS PER SAMPLE
+    # -------------------------------------------------
+
+    # OUT (driver retires): the last 20 positions didn't move much
+    xs = telemetry_data["X"].to_numpy(dtype=np.float64)
+    is_out = rolling_stationary_mask(xs, 20, 1.0)
+    is_out[:11] = False
+    is_out &= ~before_first_lap
+
+    # PIT (lap has pit entry/exit), one flag per lap gathered per sample
+    pit_flags_arr = (laps["PitOutTime"].notna() | laps["PitInTime"].notna()).to_numpy()
+    is_pit = pit_flags_arr[lap_pos] & ~before_first_lap
+
+    pit_status = np.where(is_out, RETIRED, np.where(is_pit, IN_PIT, ON_TRACK)).astype(np.int8)
+
+    ys = telemetry_data["Y"].to_numpy()
+
+    code = session.get_driver(drv)["Abbreviation"]
+
+    return DriverTrace(
+        driver_code=code,
+        xs=xs,
+        ys=ys,
+        times=times_sec.astype(np.float32),
+        speeds=speeds.astype(np.float32),
+        gears=gears.astype(np.uint8),
+        drs=drs.astype(np.uint8),
+        tyres=tyre_series,
+        distances=distances.astype(np.float32),
+        sectors=sectors_list,
+        lap_numbers=lap_numbers_list,
+        pit_status=pit_status
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def get_session(year: int, round_number: int):
+    """Race session for (year, round_number), loaded at most once per process."""
+    os.makedirs("f1_cache", exist_ok=True)
+    fastf1.Cache.enable_cache("f1_cache")
 
-  # <-- NEW
+    session = fastf1.get_session(year, round_number, 'R')
+    session.load(laps=True, telemetry=True)
+    return session
 
 
 def load_race_telemetry(year: int, round_number: int) -> Dict[str, DriverTrace]:
-    fastf1.Cache.enable_cache(".fastf1-cache")
-
-    session = fastf1.get_session(year, round_number, 'R')
-    session.load()
-
-    telemetry: Dict[str, DriverTrace] = {}
+    session = get_session(year, round_number)
 
+    # Slice laps in this thread; fastf1 session access is not thread-safe
+    driver_laps = []
     for drv in session.drivers:
         laps = session.laps.pick_drivers(drv)
-        if laps.empty:
-            continue
-
-        # Use get_telemetry() to get all data, including distance
-        telemetry_data = laps.get_telemetry()
-
-        if telemetry_data.empty:
-            continue
-
-        session_times = telemetry_data["SessionTime"]
-        t0 = session_times.iloc[0]
-        times_sec = (session_times - t0).dt.total_seconds().to_numpy()
-
-        speeds = telemetry_data["Speed"].fillna(0).to_numpy()
-        distances = telemetry_data["Distance"].fillna(0).to_numpy()
-        gears = telemetry_data["nGear"].fillna(0).astype(int).to_numpy() if "nGear" in telemetry_data else np.zeros(
-            len(session_times), dtype=int)
-        drs = telemetry_data["DRS"].fillna(0).astype(int).to_numpy() if "DRS" in telemetry_data else np.zeros(len(session_times),
-                                                                                                             dtype=int)
+        if not laps.empty:
+            driver_laps.append((drv, laps))
+
+    telemetry: Dict[str, DriverTrace] = {}
 
-      
-        # --------------------------------------
-        # TYRE COMPOUND PER TELEMETRY SAMPLE
-        # --------------------------------------
-
-        # Extract lap start times & compounds
-        lap_numbers = laps["LapNumber"].to_list()
-        lap_start_times = laps["LapStartTime"].to_list()
-        lap_compounds = laps["Compound"].to_list()
-
-        tyre_series = []
-
-        for i in range(len(telemetry_data)):
-            t_sample = telemetry_data["SessionTime"].iloc[i]
-
-            # Find the lap whose LapStartTime is <= timestamp and is the latest
-            lap_index = None
-            for j in range(len(lap_start_times)):
-                if lap_start_times[j] <= t_sample:
-                    lap_index = j
-                else:
-                    break
-
-            if lap_index is None:
-                tyre_series.append("UNK")
-            else:
-                tyre_series.append(lap_compounds[lap_index])
-
-        # --------------------------------------
-        # LAP NUMBER + SECTOR TIMES PER SAMPLE
-        # --------------------------------------
-
-        lap_numbers_list = []
-        sectors_list = []
-
-        for i in range(len(telemetry_data)):
-            t_sample = telemetry_data["SessionTime"].iloc[i]
-
-            # Find lap for this timestamp
-            lap_match = laps[(laps["LapStartTime"] <= t_sample)]
-            if lap_match.empty:
-                lap_numbers_list.append(0)
-                sectors_list.append((0, 0, 0))
-                continue
-
-            lap_row = lap_match.iloc[-1]  # latest lap <= timestamp
-            lap_numbers_list.append(int(lap_row["LapNumber"]))
-
-            # Extract sector times (FastF1 format)
-            s1 = lap_row.get("Sector1Time", pd.Timedelta(0))
-            s2 = lap_row.get("Sector2Time", pd.Timedelta(0))
-            s3 = lap_row.get("Sector3Time", pd.Timedelta(0))
-
-            # Convert timedeltas to seconds (float)
-            s1 = s1.total_seconds() if hasattr(s1, "total_seconds") else 0
-            s2 = s2.total_seconds() if hasattr(s2, "total_seconds") else 0
-            s3 = s3.total_seconds() if hasattr(s3, "total_seconds") else 0
-
-            sectors_list.append((s1, s2, s3))
-        # -------------------------------------------------
-        # PIT STATUS PER SAMPLE
-        # -------------------------------------------------
-
-        pit_status_list = []
-        lap_pit_flags = laps["PitOutTime"].notna() | laps["PitInTime"].notna()
-
-        for i in range(len(telemetry_data)):
-            t_sample = telemetry_data["SessionTime"].iloc[i]
-
-            # Find lap for timestamp
-            lap_match = laps[laps["LapStartTime"] <= t_sample]
-            if lap_match.empty:
-                pit_status_list.append("")
-                continue
-
-            lap_row = lap_match.iloc[-1]
-
-            # OUT (driver retires)
-            if i > 10:
-                # fixed condition: if the last 20 positions didn't move much
-                recent = telemetry_data.iloc[max(0, i - 20):i]["X"]
-                if recent.max() - recent.min() < 1:  # car stationary
-                    pit_status_list.append("OUT")
-                    continue
-
-            # PIT (lap has pit entry/exit)
-            lap_num = int(lap_row["LapNumber"])
-            if lap_pit_flags.iloc[lap_num - 1]:
-                pit_status_list.append("PIT")
-            else:
-                pit_status_list.append("")
-
-
-
-
-        xs = telemetry_data["X"].to_numpy()
-        ys = telemetry_data["Y"].to_numpy()
-
-        code = session.get_driver(drv)["Abbreviation"]
-
-        telemetry[code] = DriverTrace(
-            driver_code=code,
-            positions=list(zip(xs, ys)),
-            times=list(times_sec),
-            speeds=list(speeds),
-            gears=list(gears),
-            drs=list(drs),
-            tyres=tyre_series,
-            distances=list(distances),
-            sectors=sectors_list,
-            lap_numbers=lap_numbers_list,
-            pit_status=pit_status_list
-
-        )
+    with ThreadPoolExecutor() as pool:
+        for tr in pool.map(lambda args: _process_driver(args[0], session, args[1]), driver_laps):
+            if tr is not None:
+                telemetry[tr.driver_code] = tr
 
     return telemetry
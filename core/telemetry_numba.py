@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+from numba import njit
+
+
+# ============================================================
+# Stationary car detection (rolling X range)
+# ============================================================
+
+@njit(cache=True, nogil=True)
+def rolling_stationary_mask(x: np.ndarray, window: int, thresh: float) -> np.ndarray:
+    """
+    For every sample i, checks whether the previous `window` samples
+    x[i - window:i] span less than `thresh` (car not moving).
+
+    Rolling min/max are kept in two monotonic index queues, so the
+    whole pass is O(N) regardless of the window size.
+    """
+    n = x.shape[0]
+    mask = np.zeros(n, dtype=np.bool_)
+
+    max_q = np.empty(n, dtype=np.int64)
+    min_q = np.empty(n, dtype=np.int64)
+    max_head = 0
+    max_tail = 0
+    min_head = 0
+    min_tail = 0
+
+    for i in range(1, n):
+        # newest sample entering the window
+        j = i - 1
+
+        while max_tail > max_head and x[max_q[max_tail - 1]] <= x[j]:
+            max_tail -= 1
+        max_q[max_tail] = j
+        max_tail += 1
+
+        while min_tail > min_head and x[min_q[min_tail - 1]] >= x[j]:
+            min_tail -= 1
+        min_q[min_tail] = j
+        min_tail += 1
+
+        # drop samples that fell out of the window
+        start = i - window
+        while max_q[max_head] < start:
+            max_head += 1
+        while min_q[min_head] < start:
+            min_head += 1
+
+        mask[i] = x[max_q[max_head]] - x[min_q[min_head]] < thresh
+
+    return mask
+
+
+# ============================================================
+# Cumulative distance along an X/Y trace
+# ============================================================
+
+@njit(cache=True, nogil=True, fastmath=True)
+def cumulative_distance(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Running sum of the segment lengths between consecutive (x, y)
+    samples, starting at 0. One fused pass with no temporaries.
+    """
+    n = x.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+
+    out[0] = 0.0
+    total = 0.0
+    for i in range(1, n):
+        total += math.hypot(x[i] - x[i - 1], y[i] - y[i - 1])
+        out[i] = total
+
+    return out
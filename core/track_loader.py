@@ -1,38 +1,48 @@
 import xml.etree.ElementTree as ET
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict
+
+try:
+    from lxml import etree
+except ImportError:  # stdlib parser fallback
+    etree = None
+
+
+# Track elements in document order, namespace-agnostic (compiled once)
+if etree is not None:
+    TRACK_ELEMENTS = etree.XPath(
+        "//*[local-name()='polyline' or local-name()='circle' or local-name()='line']"
+    )
 
 
 # ============================================================
 # Utility: convert SVG → numpy array of points
 # ============================================================
 
-def parse_points(points_str: str) -> List[Tuple[float, float]]:
-    pts = []
-    for pair in points_str.strip().split():
-        if "," in pair:
-            x, y = pair.split(",")
-            pts.append((float(x), float(y)))
-    return pts
+def parse_points(points_str: str) -> np.ndarray:
+    # "x1,y1 x2,y2 ..." parsed in one C pass into an (N, 2) array
+    flat = np.fromstring(points_str.replace(",", " "), sep=" ", dtype=np.float64)
+    # drop a dangling coordinate instead of failing the whole track
+    return flat[:flat.size // 2 * 2].reshape(-1, 2)
 
 
 # ============================================================
 # Normalization: center & scale SVG to internal coordinates
 # ============================================================
 
-def normalize_points(points: List[Tuple[float, float]]) -> np.ndarray:
-    pts = np.array(points, dtype=float)
-
-    min_x, min_y = pts.min(axis=0)
-    max_x, max_y = pts.max(axis=0)
+def normalize_points(points: np.ndarray) -> np.ndarray:
+    # float32 is plenty for screen-space rendering; the conversion is
+    # the only allocation, everything after works in place
+    pts = np.ascontiguousarray(points, dtype=np.float32)
 
     # translate to origin
-    pts[:, 0] -= min_x
-    pts[:, 1] -= min_y
+    pts -= pts.min(axis=0)
 
     # scale longest side to 1.0
-    scale = max(max_x - min_x, max_y - min_y)
-    pts /= (scale + 1e-9)
+    # guard against a degenerate (all-equal) polyline; an epsilon added in
+    # float32 would vanish for any realistic extent
+    scale = max(pts.max(), np.finfo(np.float32).tiny)
+    pts *= np.float32(1.0) / scale
 
     return pts
 
@@ -52,8 +62,12 @@ def load_track_svg(path: str) -> Dict:
       - GP + circuit name
     """
 
-    tree = ET.parse(path)
-    root = tree.getroot()
+    if etree is not None:
+        root = etree.parse(path).getroot()
+        elements = TRACK_ELEMENTS(root)
+    else:
+        root = ET.parse(path).getroot()
+        elements = root.iter()
 
     # ------------ metadata ------------
     gp_name = ""
@@ -66,95 +80,88 @@ def load_track_svg(path: str) -> Dict:
         gp_name = gp_el.text if gp_el is not None else ""
         circuit_name = circuit_el.text if circuit_el is not None else ""
 
-    # ------------ track polylines ------------
-    centerline = []
-    left_edge = []
-    right_edge = []
+    # ------------ single pass over track elements ------------
+    centerline = np.empty((0, 2))
+    left_edge = np.empty((0, 2))
+    right_edge = np.empty((0, 2))
 
-    for poly in root.iter():
-        tag = poly.tag.split("}")[-1]  # remove namespace if present
-        if tag == "polyline":
-            pid = poly.attrib.get("id", "")
-            pts = parse_points(poly.attrib.get("points", ""))
-
-            if pid == "centerline":
-                centerline = pts
-            elif pid == "left_edge":
-                left_edge = pts
-            elif pid == "right_edge":
-                right_edge = pts
-
-    # ------------ sector markers ------------
     s1_idx = None
     s2_idx = None
+    sf_pos = None
+    drs_zones = []
 
-    for circ in root.iter():
-        tag = circ.tag.split("}")[-1]
-        if tag == "circle":
-            cid = circ.attrib.get("id", "")
-            cx = float(circ.attrib.get("cx"))
-            cy = float(circ.attrib.get("cy"))
+    for el in elements:
+        tag = el.tag.rpartition("}")[2]  # remove namespace if present
+        attrib = el.attrib
+
+        # track polylines
+        if tag == "polyline":
+            pid = attrib.get("id", "")
+            if pid in ("centerline", "left_edge", "right_edge"):
+                pts = parse_points(attrib.get("points", ""))
+                if pid == "centerline":
+                    centerline = pts
+                elif pid == "left_edge":
+                    left_edge = pts
+                else:
+                    right_edge = pts
+
+        # sector markers
+        elif tag == "circle":
+            cid = attrib.get("id", "")
+            cx = float(attrib.get("cx"))
+            cy = float(attrib.get("cy"))
 
             if cid == "s1_marker":
                 s1_idx = (cx, cy)
             elif cid == "s2_marker":
                 s2_idx = (cx, cy)
 
-    # ------------ start/finish line ------------
-    sf_pos = None
-    for line in root.iter():
-        tag = line.tag.split("}")[-1]
-        if tag == "line" and line.attrib.get("id", "") == "start_finish":
-            x = float(line.attrib.get("x1"))
-            y = float(line.attrib.get("y1"))
-            sf_pos = (x, y)
-
-    # ------------ DRS zones ------------
-    drs_zones = []
-    for line in root.iter():
-        tag = line.tag.split("}")[-1]
-        if tag == "line" and line.attrib.get("class", "") == "drs":
-            x1 = float(line.attrib["x1"])
-            y1 = float(line.attrib["y1"])
-            x2 = float(line.attrib["x2"])
-            y2 = float(line.attrib["y2"])
-            drs_zones.append(((x1, y1), (x2, y2)))
+        elif tag == "line":
+            # start/finish line
+            if attrib.get("id", "") == "start_finish":
+                sf_pos = (float(attrib.get("x1")), float(attrib.get("y1")))
+
+            # DRS zones
+            if attrib.get("class", "") == "drs":
+                x1 = float(attrib["x1"])
+                y1 = float(attrib["y1"])
+                x2 = float(attrib["x2"])
+                y2 = float(attrib["y2"])
+                drs_zones.append(((x1, y1), (x2, y2)))
 
     # ============================================================
     # Normalize & convert to internal index-based system
     # ============================================================
 
-    if not centerline:
+    if len(centerline) == 0:
         raise ValueError(f"SVG {path} missing centerline points!")
 
     center_norm = normalize_points(centerline)
-    left_norm = normalize_points(left_edge) if left_edge else None
-    right_norm = normalize_points(right_edge) if right_edge else None
+    left_norm = normalize_points(left_edge) if len(left_edge) else None
+    right_norm = normalize_points(right_edge) if len(right_edge) else None
 
     # Convert sector/SF positions into nearest index on centerline
-    def nearest_index(pt_xy):
-        if pt_xy is None:
-            return None
-        cx, cy = pt_xy
-        cx, cy = (cx - min(p[0] for p in centerline)) / \
-                 (max(p[0] for p in centerline) - min(p[0] for p in centerline) + 1e-9), \
-                 (cy - min(p[1] for p in centerline)) / \
-                 (max(p[1] for p in centerline) - min(p[1] for p in centerline) + 1e-9)
-        diffs = center_norm - np.array([cx, cy])
-        idx = np.argmin(np.linalg.norm(diffs, axis=1))
-        return int(idx)
-
-    s1_idx = nearest_index(s1_idx)
-    s2_idx = nearest_index(s2_idx)
-    sf_idx = nearest_index(sf_pos)
+    min_xy = centerline.min(axis=0)
+    span_xy = centerline.max(axis=0) - min_xy + 1e-9
+
+    def nearest_indices(pts_xy: np.ndarray) -> np.ndarray:
+        pts_norm = (pts_xy - min_xy) / span_xy
+        # squared distances are enough for argmin, no sqrt needed
+        d2 = ((center_norm[None, :, :] - pts_norm[:, None, :]) ** 2).sum(-1)
+        return d2.argmin(axis=1)
+
+    # All marker + DRS points resolved in one batch, unpacked in order
+    marker_pts = [s1_idx, s2_idx, sf_pos]
+    queries = [pt for pt in marker_pts if pt is not None]
+    queries += [pt for zone in drs_zones for pt in zone]
+
+    found = iter(nearest_indices(np.array(queries, dtype=float)).tolist() if queries else [])
+
+    s1_idx, s2_idx, sf_idx = (next(found) if pt is not None else None for pt in marker_pts)
 
     # Convert DRS zones into fraction ranges
-    drs_ranges = []
-    for (p1, p2) in drs_zones:
-        i1 = nearest_index(p1)
-        i2 = nearest_index(p2)
-        if i1 is not None and i2 is not None:
-            drs_ranges.append((i1, i2))
+    drs_ranges = [(next(found), next(found)) for _ in drs_zones]
 
     # ============================================================
     # Build final structure
@@ -1,19 +1,16 @@
-from core.telemetry_loader import load_race_telemetry
+import numpy as np
+
+from core.telemetry_cache import load_or_build
 
 year = 2023
 round_number = 1
 
-traces = load_race_telemetry(year, round_number)
-
-xs = []
-ys = []
+traces = load_or_build(year, round_number, columns=["xs", "ys"])
 
-for tr in traces.values():
-    for x, y in tr.positions:
-        xs.append(x)
-        ys.append(y)
+all_x = np.concatenate([tr.xs for tr in traces.values()])
+all_y = np.concatenate([tr.ys for tr in traces.values()])
 
-print("min_x =", min(xs))
-print("max_x =", max(xs))
-print("min_y =", min(ys))
-print("max_y =", max(ys))
+print("min_x =", all_x.min())
+print("max_x =", all_x.max())
+print("min_y =", all_y.min())
+print("max_y =", all_y.max())
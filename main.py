@@ -1,8 +1,36 @@
+import os
+import time
+
 import fastf1
 import fastf1.events
+import pandas as pd
 from ui.menu import menu_screen
 from ui.replay import run_replay
 
+SCHEDULE_CACHE_DIR = ".schedule-cache"
+SCHEDULE_TTL = 24 * 60 * 60  # seconds
+
+
+def load_schedule(year):
+    """Event schedule for `year`, read from the local cache while it is less than a day old."""
+    path = os.path.join(SCHEDULE_CACHE_DIR, f"{year}.parquet")
+
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < SCHEDULE_TTL:
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"[WARNING] Ignoring unreadable schedule cache {path}: {e}")
+
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+
+    try:
+        os.makedirs(SCHEDULE_CACHE_DIR, exist_ok=True)
+        pd.DataFrame(schedule).to_parquet(path)
+    except Exception as e:
+        print(f"[WARNING] Could not cache schedule for {year}: {e}")
+
+    return schedule
+
 
 def main():
     print("\n=== F1 RACE VISION (2025 REPLAY MODE) ===\n")
@@ -13,29 +41,32 @@ def main():
 
     # --- Step 1: Get available races and show menu ---
     races_by_year = {}
+    circuit_by_round = {}
     # Start with the desired year, but be ready to fall back
     year_to_try = 2025
     
     try:
         print(f"[INFO] Fetching event schedule for {year_to_try}...")
-        schedule = fastf1.get_event_schedule(year_to_try, include_testing=False)
+        schedule = load_schedule(year_to_try)
         races_by_year[year_to_try] = [
             (row['RoundNumber'], row['EventName'])
             for _, row in schedule.iterrows()
             if row['EventFormat'] != 'testing'
         ]
+        circuit_by_round = schedule.set_index('RoundNumber')['Location'].to_dict()
     except Exception as e:
         print(f"[WARNING] Could not fetch {year_to_try} schedule from FastF1: {e}")
         print("[INFO] Attempting to fall back to previous year's schedule...")
         year_to_try = 2024 # Fallback year
         try:
             print(f"[INFO] Fetching event schedule for {year_to_try}...")
-            schedule = fastf1.get_event_schedule(year_to_try, include_testing=False)
+            schedule = load_schedule(year_to_try)
             races_by_year[year_to_try] = [
                 (row['RoundNumber'], row['EventName'])
                 for _, row in schedule.iterrows()
                 if row['EventFormat'] != 'testing'
             ]
+            circuit_by_round = schedule.set_index('RoundNumber')['Location'].to_dict()
         except Exception as e2:
             print(f"[ERROR] Failed to fetch fallback schedule for {year_to_try}: {e2}")
             print("[ERROR] Please check your internet connection or try again later. Exiting.")
@@ -47,13 +78,8 @@ def main():
         print("No race selected. Exiting.")
         return
 
-    # --- Step 2: Get circuit name ---
-    try:
-        event = fastf1.get_event(year, round_number)
-        circuit_name = event['Location']
-    except Exception as e:
-        print(f"[WARNING] Could not fetch circuit name: {e}")
-        circuit_name = ""
+    # --- Step 2: Get circuit name (already in the schedule) ---
+    circuit_name = circuit_by_round.get(round_number, "")
 
     # --- Step 3: Start replay UI ---
     run_replay(year, round_number, gp_name, circuit_name)
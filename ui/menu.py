@@ -1,12 +1,11 @@
 import pygame
 
-pygame.init()
-
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 700
 
-FONT = pygame.font.SysFont("Arial", 24, bold=True)
-SMALL_FONT = pygame.font.SysFont("Arial", 20)
+# Created by load_fonts(); nothing touches pygame at import time, so
+# worker processes can import this package without starting SDL
+FONTS = {}
 
 # --- F1 Themed Colors ---
 C_BG = (15, 15, 22)          # Dark charcoal
@@ -19,19 +18,49 @@ C_BORDER = (80, 80, 90)      # Border for list items
 SCROLL_SPEED = 40        # pixels per mouse wheel event
 DEBOUNCE_TIME = 150      # ms to prevent double input
 
+LIST_TOP = 200           # y of the first race row
+ROW_HEIGHT = 50          # spacing between race rows
+
+
+def load_fonts():
+    """Creates the menu fonts; call after pygame.init()."""
+    FONTS["title"] = pygame.font.SysFont("Arial", 24, bold=True)
+    FONTS["small"] = pygame.font.SysFont("Arial", 20)
+
 
 def draw_button(screen, rect, text, hover=False):
     """Draws a styled button, changing color on hover."""
     color = C_BTN_HOVER if hover else C_BTN
     pygame.draw.rect(screen, color, rect, border_radius=8)
-    label = FONT.render(text, True, C_TEXT)
+    label = FONTS["title"].render(text, True, C_TEXT)
     screen.blit(label, (
         rect.x + (rect.width - label.get_width()) // 2,
         rect.y + (rect.height - label.get_height()) // 2
     ))
 
 
+def race_row_rect(i, scroll_offset):
+    """Screen rect of the i-th race row for the given scroll offset."""
+    return pygame.Rect(60, LIST_TOP + i * ROW_HEIGHT - scroll_offset, WINDOW_WIDTH - 120, 40)
+
+
+def render_race_labels(races):
+    """Pre-renders the label of every race row, keyed by round number."""
+    return {rnd: FONTS["small"].render(f"R{rnd:02d}  |  {name}", True, C_TEXT).convert_alpha() for rnd, name in races}
+
+
+def draw_race_row(screen, rect, label, hovered=False):
+    """Draws one race list item with a red border on hover."""
+    pygame.draw.rect(screen, C_BTN, rect, border_radius=6)
+    if hovered:
+        pygame.draw.rect(screen, C_ACCENT_RED, rect, 2, border_radius=6)
+
+    screen.blit(label, (rect.x + 15, rect.y + 9))
+
+
 def menu_screen(races_by_year, default_year=None):
+    pygame.init()
+    load_fonts()
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("F1 Replay – Select Race")
     clock = pygame.time.Clock()
@@ -54,94 +83,148 @@ def menu_screen(races_by_year, default_year=None):
     scroll_offset = 0
     max_scroll = 0
 
+    # Static layer (background + title) is painted once and reused to
+    # erase anything that changes
+    screen.fill(C_BG)
+    title = FONTS["title"].render("SELECT A RACE", True, C_TEXT)
+    screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 50))
+    pygame.draw.line(screen, C_ACCENT_RED, (200, 90), (400, 90), 3)
+    background = screen.copy()
+
+    # Year change buttons
+    minus_rect = pygame.Rect(WINDOW_WIDTH // 2 - 100, 125, 50, 40)
+    plus_rect = pygame.Rect(WINDOW_WIDTH // 2 + 50, 125, 50, 40)
+    buttons = {"minus": (minus_rect, "<"), "plus": (plus_rect, ">")}
+
+    list_area_height = WINDOW_HEIGHT - LIST_TOP - 50
+    list_view = pygame.Rect(0, LIST_TOP, WINDOW_WIDTH, WINDOW_HEIGHT - LIST_TOP)
+
+    # What is currently on screen; repaint only when it changes
+    drawn_state = None
+    drawn_hover = None
+
+    # Row label surfaces for the current year, rebuilt only when the year changes
+    label_cache = {}
+    label_year = None
+
     running = True
     while running:
         dt = clock.tick(60)
         year_cooldown = max(0, year_cooldown - dt)
 
+        # ========== EVENT HANDLING ==========
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            # Window contents were lost; repaint everything this frame
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                drawn_state = None
+
+            # Scroll with mouse wheel
+            if event.type == pygame.MOUSEWHEEL:
+                scroll_offset -= event.y * SCROLL_SPEED
+
+            # Keyboard scrolling
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    scroll_offset -= SCROLL_SPEED
+                elif event.key == pygame.K_DOWN:
+                    scroll_offset += SCROLL_SPEED
+
+        if not running:
+            break
+
         mouse = pygame.mouse.get_pos()
         click = pygame.mouse.get_pressed()[0]
 
-        screen.fill(C_BG)
-
-        # Title
-        title = FONT.render("SELECT A RACE", True, C_TEXT)
-        screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 50))
-        pygame.draw.line(screen, C_ACCENT_RED, (200, 90), (400, 90), 3)
+        races = races_by_year.get(year, [])
 
-        # Year label
-        year_label = FONT.render(str(year), True, C_TEXT)
-        screen.blit(year_label, (WINDOW_WIDTH // 2 - year_label.get_width() // 2, 130))
+        # Compute max scroll
+        max_scroll = max(0, len(races) * ROW_HEIGHT - list_area_height)
 
-        # Year change buttons
-        minus_rect = pygame.Rect(WINDOW_WIDTH // 2 - 100, 125, 50, 40)
-        plus_rect = pygame.Rect(WINDOW_WIDTH // 2 + 50, 125, 50, 40)
+        # Clip scroll area
+        scroll_offset = max(0, min(scroll_offset, max_scroll))
 
-        draw_button(screen, minus_rect, "<", minus_rect.collidepoint(mouse))
-        draw_button(screen, plus_rect, ">", plus_rect.collidepoint(mouse))
+        # Hover target: "minus", "plus", a race index, or None
+        hover = None
+        if minus_rect.collidepoint(mouse):
+            hover = "minus"
+        elif plus_rect.collidepoint(mouse):
+            hover = "plus"
+        elif list_view.collidepoint(mouse):
+            i = (mouse[1] - LIST_TOP + scroll_offset) // ROW_HEIGHT
+            if 0 <= i < len(races) and race_row_rect(i, scroll_offset).collidepoint(mouse):
+                hover = i
 
         # YEAR CHANGE — with cooldown to avoid double increments
-        if click and minus_rect.collidepoint(mouse) and year_cooldown == 0:
+        if click and hover == "minus" and year_cooldown == 0:
             year_index = max(0, year_index - 1)
             year = years[year_index]
             scroll_offset = 0
             year_cooldown = DEBOUNCE_TIME
 
-        if click and plus_rect.collidepoint(mouse) and year_cooldown == 0:
+        if click and hover == "plus" and year_cooldown == 0:
             year_index = min(len(years) - 1, year_index + 1)
             year = years[year_index]
             scroll_offset = 0
             year_cooldown = DEBOUNCE_TIME
 
-        # ========== RACE LIST WITH SCROLLING ==========
-        races = races_by_year.get(year, [])
-        list_top = 200
-        list_area_height = WINDOW_HEIGHT - list_top - 50
-
-        # Compute max scroll
-        max_scroll = max(0, len(races) * 50 - list_area_height)
-
-        # Clip scroll area
-        scroll_offset = max(0, min(scroll_offset, max_scroll))
-
-        # Draw each race button inside scroll area
-        y = list_top - scroll_offset
-
-        for rnd, name in races:
-            rect = pygame.Rect(60, y, WINDOW_WIDTH - 120, 40)
-            hovered = rect.collidepoint(mouse)
-
-            # Draw list item with a red border on hover
-            pygame.draw.rect(screen, C_BTN, rect, border_radius=6)
-            if hovered:
-                pygame.draw.rect(screen, C_ACCENT_RED, rect, 2, border_radius=6)
-
-            label = SMALL_FONT.render(f"R{rnd:02d}  |  {name}", True, C_TEXT)
-            screen.blit(label, (rect.x + 15, rect.y + 9))
-
-            if hovered and click:
-                pygame.time.wait(120)
-                return year, rnd, name
-
-            y += 50
+        if click and isinstance(hover, int):
+            rnd, name = races[hover]
+            pygame.time.wait(120)
+            return year, rnd, name
 
-        # ========== EVENT HANDLING ==========
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-            # Scroll with mouse wheel
-            if event.type == pygame.MOUSEWHEEL:
-                scroll_offset -= event.y * SCROLL_SPEED
-
-            # Keyboard scrolling
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    scroll_offset -= SCROLL_SPEED
-                elif event.key == pygame.K_DOWN:
-                    scroll_offset += SCROLL_SPEED
+        races = races_by_year.get(year, [])
 
-        pygame.display.flip()
+        # ========== FULL REPAINT: year or scroll changed ==========
+        if (year, scroll_offset) != drawn_state:
+            if label_year != year:
+                label_cache = render_race_labels(races)
+                label_year = year
+
+            screen.blit(background, (0, 0))
+
+            # Year label
+            year_label = FONTS["title"].render(str(year), True, C_TEXT)
+            screen.blit(year_label, (WINDOW_WIDTH // 2 - year_label.get_width() // 2, 130))
+
+            for key, (rect, text) in buttons.items():
+                draw_button(screen, rect, text, hover == key)
+
+            # Race list, clipped to the scroll area; only rows in view are drawn
+            first = scroll_offset // ROW_HEIGHT
+            last = min(len(races), first + list_view.height // ROW_HEIGHT + 2)
+            screen.set_clip(list_view)
+            for i in range(first, last):
+                rnd, _ = races[i]
+                draw_race_row(screen, race_row_rect(i, scroll_offset), label_cache[rnd], hover == i)
+            screen.set_clip(None)
+
+            pygame.display.update()
+            drawn_state = (year, scroll_offset)
+            drawn_hover = hover
+
+        # ========== HOVER ONLY: redraw the two affected items ==========
+        elif hover != drawn_hover:
+            dirty = []
+            for target in (drawn_hover, hover):
+                if target in buttons:
+                    rect, text = buttons[target]
+                    screen.blit(background, rect, rect)
+                    draw_button(screen, rect, text, hover == target)
+                    dirty.append(rect)
+                elif target is not None:
+                    rnd, _ = races[target]
+                    rect = race_row_rect(target, scroll_offset)
+                    screen.set_clip(list_view)
+                    screen.blit(background, rect, rect)
+                    draw_race_row(screen, rect, label_cache[rnd], hover == target)
+                    screen.set_clip(None)
+                    dirty.append(rect.clip(list_view))
+
+            pygame.display.update(dirty)
+            drawn_hover = hover
 
     pygame.quit()
     return None, None, None
@@ -1,14 +1,15 @@
+import functools
 import math
-from typing import Dict, List, Tuple
+import multiprocessing
+import os
+from typing import Dict, List, NamedTuple, Tuple
 import threading
 import pygame
-import fastf1
-import os
 import pandas
-import bisect
 import numpy
-from concurrent.futures import ThreadPoolExecutor
-from core.telemetry_loader import DriverTrace
+from concurrent.futures import ProcessPoolExecutor
+from core.telemetry_loader import (COMPOUNDS, DriverTrace, cumulative_distance, encode_categories, encode_compounds,
+                                   get_session, ON_TRACK, PIT_STATUSES, resample_uniform, UNKNOWN_COMPOUND)
 
 # ============================================================
 #                      CONSTANTS & COLORS
@@ -29,6 +30,13 @@ C_GREY = (200, 200, 200)
 C_DRS_ON = (0, 255, 0)
 C_DRS_OFF = (255, 70, 70)
 
+# Screen regions redrawn every frame (see the dirty-rect update in run_replay)
+HUD_RECT = pygame.Rect(LEFT_PANEL_WIDTH, 0, WINDOW_WIDTH - LEFT_PANEL_WIDTH - RIGHT_PANEL_WIDTH, 50)
+LAP_INFO_RECT = pygame.Rect(LEFT_PANEL_WIDTH, WINDOW_HEIGHT - 50,
+                            WINDOW_WIDTH - LEFT_PANEL_WIDTH - RIGHT_PANEL_WIDTH, 50)
+DRIVER_INFO_RECT = pygame.Rect(WINDOW_WIDTH - RIGHT_PANEL_WIDTH, 50, RIGHT_PANEL_WIDTH, 170)
+LEADERBOARD_RECT = pygame.Rect(0, 0, LEFT_PANEL_WIDTH, WINDOW_HEIGHT)
+
 TYRE_COLORS = {
     "SOFT": (255, 60, 60),
     "MEDIUM": (255, 220, 0),
@@ -43,21 +51,34 @@ TYRE_COLORS = {
 # ============================================================
 
 def compute_bounds(traces: Dict[str, DriverTrace]) -> Tuple[float, float, float, float]:
-    xs, ys = [], []
-    for tr in traces.values():
-        xs.extend([p[0] for p in tr.positions])
-        ys.extend([p[1] for p in tr.positions])
-    return min(xs), max(xs), min(ys), max(ys)
-
-
-def world_to_screen(x: float, y: float, bounds) -> Tuple[int, int]:
+    # Per-driver reductions, then fold the (D, 2) results across drivers
+    lows = numpy.array([(tr.xs.min(), tr.ys.min()) for tr in traces.values() if len(tr.xs)])
+    highs = numpy.array([(tr.xs.max(), tr.ys.max()) for tr in traces.values() if len(tr.xs)])
+    min_x, min_y = lows.min(axis=0)
+    max_x, max_y = highs.max(axis=0)
+    return float(min_x), float(max_x), float(min_y), float(max_y)
+
+
+class Projector(NamedTuple):
+    """World -> screen affine transform: sx = x * scale_x + offset_x (same for y)."""
+    scale_x: float
+    scale_y: float
+    offset_x: float
+    offset_y: float
+
+    def to_screen_batch(self, xs: numpy.ndarray, ys: numpy.ndarray) -> numpy.ndarray:
+        """Projects many points at once into an (N, 2) int32 array."""
+        pts = numpy.empty((len(xs), 2), dtype=numpy.int32)
+        pts[:, 0] = xs * self.scale_x + self.offset_x
+        pts[:, 1] = ys * self.scale_y + self.offset_y
+        return pts
+
+
+def make_projector(bounds) -> Projector:
     min_x, max_x, min_y, max_y = bounds
     range_x = max_x - min_x if max_x != min_x else 1.0
     range_y = max_y - min_y if max_y != min_y else 1.0
 
-    nx = (x - min_x) / range_x
-    ny = (y - min_y) / range_y
-
     margin_left = LEFT_PANEL_WIDTH + 50
     margin_right = RIGHT_PANEL_WIDTH + 50
     margin_top = 50
@@ -66,286 +87,417 @@ def world_to_screen(x: float, y: float, bounds) -> Tuple[int, int]:
     usable_w = WINDOW_WIDTH - margin_left - margin_right
     usable_h = WINDOW_HEIGHT - margin_top - margin_bottom
 
-    sx = margin_left + nx * usable_w
-    sy = WINDOW_HEIGHT - (margin_bottom + ny * usable_h)
-    return int(sx), int(sy)
+    # sx = margin_left + nx * usable_w
+    # sy = WINDOW_HEIGHT - (margin_bottom + ny * usable_h)
+    scale_x = usable_w / range_x
+    scale_y = -usable_h / range_y
+    return Projector(
+        scale_x=scale_x,
+        scale_y=scale_y,
+        offset_x=margin_left - min_x * scale_x,
+        offset_y=WINDOW_HEIGHT - margin_bottom - min_y * scale_y,
+    )
+
 
+def simplify_polyline(points: numpy.ndarray, epsilon: float = 1.0) -> numpy.ndarray:
+    """
+    Ramer-Douglas-Peucker: drops every vertex that lies within `epsilon`
+    pixels of the simplified line, so straights collapse to a few points
+    while corners keep their detail.
+    """
+    pts = points.astype(numpy.float64)
+    keep = numpy.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        seg = pts[end] - pts[start]
+        rel = pts[start + 1:end] - pts[start]
+        length = math.hypot(seg[0], seg[1])
+        if length == 0:
+            dist = numpy.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = numpy.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
 
-def build_track_geometry(traces: Dict[str, DriverTrace], bounds):
+        i = int(dist.argmax())
+        if dist[i] > epsilon:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+
+    return points[keep]
+
+
+def track_centerline(traces: Dict[str, DriverTrace]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """World-space X/Y of one representative lap of the first driver, thinned to ~1000 points."""
     first_driver = next(iter(traces.values()))
-    centerline_world_source = first_driver.positions
+    xs, ys = first_driver.xs, first_driver.ys
 
-    if hasattr(first_driver, 'lap_numbers') and first_driver.lap_numbers:
-        laps = first_driver.lap_numbers
-        lap_to_use = next((lap for lap in [2, 3, 1] if lap in laps), None)
-        if lap_to_use is not None:
-            lap_positions = [first_driver.positions[i]
-                             for i in range(len(laps)) if laps[i] == lap_to_use]
-            if lap_positions:
-                centerline_world_source = lap_positions
+    laps = first_driver.lap_numbers
+    lap_to_use = next((lap for lap in [2, 3, 1] if lap in laps), None)
+    if lap_to_use is not None:
+        on_lap = laps == lap_to_use
+        xs, ys = xs[on_lap], ys[on_lap]
 
-    step = max(1, len(centerline_world_source) // 1000)
-    centerline_world = centerline_world_source[::step]
+    step = max(1, len(xs) // 1000)
+    return xs[::step], ys[::step]
 
-    if len(centerline_world) < 3:
+
+def build_track_geometry(xs: numpy.ndarray, ys: numpy.ndarray, projector: Projector):
+    if len(xs) < 3:
         return [], {}
 
-    centerline_screen = [world_to_screen(x, y, bounds) for (x, y) in centerline_world]
+    # (N, 2) int32, handed to pygame.draw as-is
+    centerline_screen = projector.to_screen_batch(xs, ys)
 
     n = len(centerline_screen)
     s2_idx = n // 3
     s3_idx = 2 * n // 3
 
+    s1_x, s1_y = centerline_screen[0].tolist()
+    s2_x, s2_y = centerline_screen[s2_idx].tolist()
+    s3_x, s3_y = centerline_screen[s3_idx].tolist()
+
     markers = {
-        "s1_line": centerline_screen[0],
-        "s2_line": centerline_screen[s2_idx],
-        "s3_line": centerline_screen[s3_idx],
-        "s1_label_pos": (centerline_screen[0][0] - 50, centerline_screen[0][1] - 10),
-        "s2_label_pos": (centerline_screen[s2_idx][0] + 20, centerline_screen[s2_idx][1]),
-        "s3_label_pos": (centerline_screen[s3_idx][0] + 20, centerline_screen[s3_idx][1]),
+        "s1_line": (s1_x, s1_y),
+        "s2_line": (s2_x, s2_y),
+        "s3_line": (s3_x, s3_y),
+        "s1_label_pos": (s1_x - 50, s1_y - 10),
+        "s2_label_pos": (s2_x + 20, s2_y),
+        "s3_label_pos": (s3_x + 20, s3_y),
     }
 
-    return centerline_screen, markers
+    # Markers come from the full line; only the drawn polyline is simplified
+    return simplify_polyline(centerline_screen, 1.0), markers
+
+
+def load_track_geometry(year: int, round_number: int, traces: Dict[str, DriverTrace]):
+    """
+    (projector, centerline, markers) for the race. Only the world-space
+    bounds and centerline are cached, in f1_cache/track_{year}_{round_number}.npz;
+    the screen-space geometry is rebuilt from them on every launch, so
+    window or layout changes never see stale coordinates.
+    """
+    path = os.path.join("f1_cache", f"track_{year}_{round_number}.npz")
+    cached = None
+
+    if os.path.exists(path):
+        try:
+            with numpy.load(path, allow_pickle=False) as npz:
+                cached = tuple(npz["bounds"].tolist()), npz["xs"], npz["ys"]
+        except Exception as e:
+            print(f"[WARNING] Ignoring unreadable track cache {path}: {e}")
+
+    if cached is None:
+        cached = (compute_bounds(traces), *track_centerline(traces))
+        bounds, xs, ys = cached
+        try:
+            os.makedirs("f1_cache", exist_ok=True)
+            numpy.savez(path, bounds=numpy.array(bounds), xs=xs, ys=ys)
+        except Exception as e:
+            print(f"[WARNING] Could not cache track geometry {path}: {e}")
+
+    bounds, xs, ys = cached
+    projector = make_projector(bounds)
+    return (projector, *build_track_geometry(xs, ys, projector))
 
 # ============================================================
 #                   DATA PROCESSING (FIXED)
 # ============================================================
 
+class TimeIndex(NamedTuple):
+    """
+    Traces resampled onto the shared k / rate time lattice: the current
+    sample of every driver is plain integer arithmetic, no search.
+    """
+    codes: List[str]
+    first: numpy.ndarray    # lattice step of each driver's sample 0
+    last: numpy.ndarray     # last valid index per driver
+    rate: float
+
+    def lookup(self, t: float) -> numpy.ndarray:
+        """Index of the latest sample at or before `t`, per driver (0 before the first)."""
+        return numpy.clip(math.floor(t * self.rate) - self.first, 0, self.last)
+
+
+def build_time_index(traces: Dict[str, DriverTrace]) -> TimeIndex:
+    rate = next(iter(traces.values())).rate
+    return TimeIndex(
+        codes=list(traces),
+        first=numpy.array([round(tr.t0 * rate) for tr in traces.values()], dtype=numpy.int64),
+        last=numpy.array([len(tr.times) - 1 for tr in traces.values()], dtype=numpy.int64),
+        rate=rate,
+    )
+
+
 def compute_ranking_data(traces: Dict[str, DriverTrace], indices: Dict[str, int]) -> List[Dict]:
-    ranking = []
-    for code, tr in traces.items():
-        idx = indices.get(code, 0)
-        if idx >= len(tr.distances):
-            continue
+    codes = [code for code, tr in traces.items() if indices.get(code, 0) < len(tr.distances)]
+    if not codes:
+        return []
 
-        status = ""
-        if hasattr(tr, 'pit_status') and idx < len(tr.pit_status):
-            status = tr.pit_status[idx]
-
-        ranking.append({
-            "code": code,
-            "progress": tr.distances[idx],
-            "lap": tr.lap_numbers[idx],
-            "time": tr.times[idx],
-            "current_tyre": tr.tyres[idx],
-            "trace": tr,
-            "status": status
-        })
+    trs = [traces[code] for code in codes]
+    idxs = [indices.get(code, 0) for code in codes]
 
-    # Sort by lap number first, then progress on the lap
-    ranking.sort(key=lambda x: (x["lap"], x["progress"]), reverse=True)
+    # Current sample of every driver gathered into columns
+    laps = numpy.array([tr.lap_numbers[i] for tr, i in zip(trs, idxs)], dtype=numpy.int64)
+    progress = numpy.array([tr.distances[i] for tr, i in zip(trs, idxs)], dtype=numpy.float64)
+    times = numpy.array([tr.times[i] for tr, i in zip(trs, idxs)], dtype=numpy.float64)
+    status = numpy.array([tr.pit_status[i] if i < len(tr.pit_status) else ON_TRACK
+                          for tr, i in zip(trs, idxs)])
 
-    if not ranking:
-        return []
+    # Lap number first, then progress on the lap, both descending; ties keep dict order
+    order = numpy.lexsort((-numpy.arange(len(codes)), progress, laps))[::-1]
+
+    laps = laps[order]
+    lap_diffs = laps[:-1] - laps[1:]
+    in_pit = status[order] != ON_TRACK
 
     out = []
-    leader = ranking[0]
-    gap_text = ""
-    if leader["status"] == "InPit":
-        gap_text = "PIT"
-    elif leader["status"] == "Out":
-        gap_text = "OUT"
-
-    out.append({
-        "position": 1,
-        "code": leader["code"],
-        "gap_to_ahead": gap_text,
-        "current_tyre": leader["current_tyre"],
-        "trace": leader["trace"]
-    })
-
-    for i in range(1, len(ranking)):
-        ahead = ranking[i - 1]
-        cur = ranking[i]
-
-        if cur["status"] == "Out":
-            gap_text = "OUT"
-        elif cur["status"] == "InPit":
-            gap_text = "PIT"
-        elif ahead["lap"] > cur["lap"]:
-            lap_diff = ahead["lap"] - cur["lap"]
+    for i, k in enumerate(order.tolist()):
+        if in_pit[i]:
+            gap_text = PIT_STATUSES[status[k]]
+        elif i == 0:
+            gap_text = ""
+        elif lap_diffs[i - 1] > 0:
+            lap_diff = int(lap_diffs[i - 1])
             gap_text = f"+{lap_diff} Lap" if lap_diff == 1 else f"+{lap_diff} Laps"
         else:
             # Accurately find the time when the car ahead was at the current car's position
-            time_ahead_at_cur_pos = numpy.interp(cur["progress"], ahead["trace"].distances, ahead["trace"].times)
-            time_gap = cur["time"] - time_ahead_at_cur_pos
+            ahead = trs[order[i - 1]]
+            time_ahead_at_cur_pos = numpy.interp(progress[k], ahead.distances, ahead.times)
+            time_gap = times[k] - time_ahead_at_cur_pos
             gap_text = f"+{time_gap:.1f}"
 
         out.append({
             "position": i + 1,
-            "code": cur["code"],
+            "code": codes[k],
             "gap_to_ahead": gap_text,
-            "current_tyre": cur["current_tyre"],
-            "trace": cur["trace"]
+            "tyre_code": int(trs[k].tyres[idxs[k]]),
+            "trace": trs[k]
         })
 
     return out
 
 
-def process_driver(session, driver_number):
+# Replay sample rate (Hz). FastF1 car data arrives at ~4 Hz, so 5 Hz keeps
+# every trace on one time lattice without inflating memory.
+RESAMPLE_RATE = 5.0
+
+LAP_COLUMNS = ["LapNumber", "LapStartTime", "Time", "Sector1Time", "Sector2Time", "Sector3Time", "Compound"]
+
+
+def prepare_driver(session, driver_number):
+    """
+    Pulls everything process_driver needs out of the FastF1 session as
+    plain, picklable pandas objects; runs in the loader thread because
+    the session itself cannot be sent to worker processes.
+    """
     try:
         info = session.get_driver(driver_number)
-        code = info["Abbreviation"]
-        team_color = info["TeamColor"]
 
         laps = session.laps.pick_drivers([driver_number])
         if laps.empty:
-            return None, None, None
+            return None
 
-        merged_all = []
+        # Whole-session streams; samples are tagged with laps in process_driver
+        car = pandas.DataFrame(session.car_data[driver_number])
+        pos = pandas.DataFrame(session.pos_data[driver_number])
+        return info["Abbreviation"], info["TeamColor"], pandas.DataFrame(laps[LAP_COLUMNS]), car, pos
 
-        # ----------------------------------------------------
-        # PROCESS EACH LAP SEPARATELY (car_data + pos_data)
-        # ----------------------------------------------------
-        for _, lap in laps.iterlaps():
-            car = lap.get_car_data()
-            pos = lap.get_pos_data()
-
-            if car.empty or pos.empty:
-                continue
-
-            # Ensure both have timedelta SessionTime
-            car["SessionTime"] = pandas.to_timedelta(car["SessionTime"], errors="coerce")
-            pos["SessionTime"] = pandas.to_timedelta(pos["SessionTime"], errors="coerce")
-
-            car = car.sort_values("SessionTime")
-            pos = pos.sort_values("SessionTime")
-
-            # merge_asof gives best alignment for real-time telemetry
-            tel = pandas.merge_asof(
-                car,
-                pos,
-                on="SessionTime",
-                direction="nearest",
-                tolerance=pandas.Timedelta("100ms")
-            )
+    except Exception as e:
+        print(f"[ERROR] Failed driver {driver_number}: {e}")
+        return None
 
-            # Drop rows where X/Y is missing
-            tel.dropna(subset=["X", "Y"], inplace=True)
 
-            # Assign lap number to each row
-            tel["LapNumber"] = lap["LapNumber"]
+def worker_context():
+    """Start method for the telemetry workers: a clean interpreter, not a fork."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
 
-            merged_all.append(tel)
 
-        if not merged_all:
+def process_driver(code, team_color, laps, car, pos):
+    try:
+        if car.empty or pos.empty:
             print(f"[WARNING] No valid telemetry for driver {code}")
             return None, None, None
 
         # ----------------------------------------------------
-        # CONCATENATE ALL LAP TELEMETRY
+        # ALIGN car_data + pos_data FOR THE WHOLE SESSION
         # ----------------------------------------------------
-        tel = pandas.concat(merged_all, ignore_index=True)
-        tel = tel.sort_values("SessionTime").reset_index(drop=True)
+        # Ensure both have timedelta SessionTime
+        car["SessionTime"] = pandas.to_timedelta(car["SessionTime"], errors="coerce")
+        pos["SessionTime"] = pandas.to_timedelta(pos["SessionTime"], errors="coerce")
+
+        car = car.sort_values("SessionTime")
+        pos = pos.sort_values("SessionTime").drop_duplicates("SessionTime")
+
+        # Nearest pos sample for every car sample (within 100ms),
+        # taken positionally instead of materializing a merged frame
+        pos_idx = pandas.Index(pos["SessionTime"]).get_indexer(
+            car["SessionTime"],
+            method="nearest",
+            tolerance=pandas.Timedelta("100ms")
+        )
+        matched = pos_idx >= 0
+
+        tel = car[matched].copy()
+        for col in ("X", "Y", "Status"):
+            tel[col] = pos[col].to_numpy()[pos_idx[matched]]
+
+        # Drop rows where X/Y is missing
+        tel.dropna(subset=["X", "Y"], inplace=True)
 
         # ----------------------------------------------------
-        # EXTRACT CONTINUOUS TIME
+        # TAG EVERY SAMPLE WITH ITS LAP
         # ----------------------------------------------------
-        times = tel["SessionTime"].dt.total_seconds().tolist()
+        # Latest lap started at or before each sample; samples before the
+        # first lap or after the last lap ends are not part of any lap
+        lap_starts = laps[["LapStartTime", "LapNumber"]].dropna().sort_values("LapStartTime")
+        tel = pandas.merge_asof(tel, lap_starts, left_on="SessionTime", right_on="LapStartTime",
+                                direction="backward")
+        on_lap = tel["LapNumber"].notna() & (tel["SessionTime"] <= laps["Time"].max())
+        tel = tel[on_lap].reset_index(drop=True)
+
+        if tel.empty:
+            print(f"[WARNING] No valid telemetry for driver {code}")
+            return None, None, None
 
         # ----------------------------------------------------
-        # CONTINUOUS DISTANCE FROM X/Y
+        # EXTRACT CONTINUOUS TIME
         # ----------------------------------------------------
-        distances = [0.0]
-        for i in range(1, len(tel)):
-            x1, y1 = tel["X"].iloc[i - 1], tel["Y"].iloc[i - 1]
-            x2, y2 = tel["X"].iloc[i], tel["Y"].iloc[i]
-            d = math.dist((x1, y1), (x2, y2))
-            distances.append(distances[-1] + d)
+        times = tel["SessionTime"].dt.total_seconds().to_numpy()
 
         # ----------------------------------------------------
-        # SECTOR TIMES PER LAP
+        # CONTINUOUS DISTANCE FROM X/Y
         # ----------------------------------------------------
-        s1 = []
-        s2 = []
-        s3 = []
-
-        for lapnum in tel["LapNumber"]:
-            lap = laps[laps["LapNumber"] == lapnum]
-            if lap.empty:
-                s1.append(0); s2.append(0); s3.append(0)
-                continue
-
-            lp = lap.iloc[0]
-            s1_val = lp["Sector1Time"].total_seconds() if lp["Sector1Time"] else 0
-            s2_val = lp["Sector2Time"].total_seconds() if lp["Sector2Time"] else 0
-            s3_val = lp["Sector3Time"].total_seconds() if lp["Sector3Time"] else 0
-            s1.append(s1_val)
-            s2.append(s2_val)
-            s3.append(s3_val)
-
-        sectors = list(zip(s1, s2, s3))
+        # float32 halves the bytes moved here and in every per-frame lookup;
+        # positions are decimetres, well within float32 precision
+        x = numpy.ascontiguousarray(tel["X"].to_numpy(dtype=numpy.float32))
+        y = numpy.ascontiguousarray(tel["Y"].to_numpy(dtype=numpy.float32))
+        distances = cumulative_distance(x, y)
 
         # ----------------------------------------------------
-        # TYRES PER LAP → expand to full telemetry length
+        # SECTOR TIMES + TYRES PER LAP → expand to every sample
         # ----------------------------------------------------
-        tyre_map = laps.set_index("LapNumber")["Compound"].fillna("UNKNOWN").to_dict()
-        tyres = [tyre_map.get(lapnum, "UNKNOWN") for lapnum in tel["LapNumber"]]
+        # One hash lookup of every sample's lap in the lap table
+        lap_info = laps.drop_duplicates("LapNumber").set_index("LapNumber")
+        lap_pos = lap_info.index.get_indexer(tel["LapNumber"])
+        has_lap = lap_pos >= 0
+        lap_pos = lap_pos.clip(0)
+
+        # Sector times as seconds, 0 where FastF1 has no timing
+        sector_arr = numpy.column_stack([
+            lap_info[col].dt.total_seconds().fillna(0).to_numpy()
+            for col in ("Sector1Time", "Sector2Time", "Sector3Time")
+        ])
+        sectors = numpy.where(has_lap[:, None], sector_arr[lap_pos], 0)
+
+        compound_arr = encode_compounds(lap_info["Compound"])
+        tyres = numpy.where(has_lap, compound_arr[lap_pos], UNKNOWN_COMPOUND).astype(numpy.int8)
 
         # ----------------------------------------------------
         # BUILD TRACE OBJECT
         # ----------------------------------------------------
         tr = DriverTrace(
             driver_code=code,
-            positions=list(zip(tel["X"], tel["Y"])),
-            times=times,
-            speeds=tel["Speed"].fillna(0).tolist(),
-            gears=tel["nGear"].fillna(0).astype(int).tolist(),
-            drs=tel["DRS"].fillna(0).tolist(),
+            xs=x,
+            ys=y,
+            times=times.astype(numpy.float32),
+            speeds=tel["Speed"].fillna(0).to_numpy(numpy.float32),
+            gears=tel["nGear"].fillna(0).to_numpy(numpy.uint8),
+            drs=tel["DRS"].fillna(0).to_numpy(numpy.uint8),
             tyres=tyres,
-            distances=distances,
-            sectors=sectors,
-            lap_numbers=tel["LapNumber"].astype(int).tolist(),
-            pit_status=tel["Status"].fillna("OnTrack").tolist()
+            distances=distances.astype(numpy.float32),
+            sectors=sectors.astype(numpy.float32),
+            lap_numbers=tel["LapNumber"].to_numpy(numpy.int16),
+            # FastF1's OnTrack/OffTrack flags carry no pit information
+            pit_status=encode_categories(tel["Status"], PIT_STATUSES, ON_TRACK)
         )
 
-        return code, tr, team_color
+        return code, resample_uniform(tr, RESAMPLE_RATE), team_color
 
     except Exception as e:
-        print(f"[ERROR] Failed driver {driver_number}: {e}")
+        print(f"[ERROR] Failed driver {code}: {e}")
         return None, None, None
 
 
 
 
+# ============================================================
+#                    CACHED TEXT RENDERING
+# ============================================================
+
+FONTS: Dict[str, pygame.font.Font] = {}
+
+# Leaderboard tyre letter for every compound code, see COMPOUNDS
+TYRE_LETTERS: Dict[int, pygame.Surface] = {}
+
+
+def load_fonts():
+    """Creates the shared fonts; call after the display mode is set."""
+    FONTS["main"] = pygame.font.SysFont("Arial", 18)
+    FONTS["hud_title"] = pygame.font.SysFont("Arial", 22, bold=True)
+    FONTS["driver_title"] = pygame.font.SysFont("Arial", 24, bold=True)
+    FONTS["marker"] = pygame.font.SysFont("Arial", 16, bold=True)
+    render_cached.cache_clear()
+
+    TYRE_LETTERS.clear()
+    for code, compound in enumerate(COMPOUNDS):
+        TYRE_LETTERS[code] = FONTS["main"].render(compound[0], True, TYRE_COLORS[compound]).convert_alpha()
+
+
+@functools.lru_cache(maxsize=2048)
+def render_cached(text: str, color, font_id: str = "main") -> pygame.Surface:
+    """font.render memoized on (text, color, font); color must be a tuple."""
+    return FONTS[font_id].render(text, True, color).convert_alpha()
+
 # ============================================================
 #                    UI DRAWING FUNCTIONS
 # ============================================================
 
-def draw_leaderboard(surface, ranked_data, font, selected):
-    surface.fill(C_BLACK)
+def draw_leaderboard_rows(surface, ranked_data):
+    """Text layer of the leaderboard (positions, codes + gaps, tyres) on a transparent surface."""
+    surface.fill((0, 0, 0, 0))
     y = 60
 
     for item in ranked_data:
         pos = item["position"]
         code = item["code"]
         gap = item["gap_to_ahead"]
-        tr = item["trace"]
 
-        if code == selected:
-            col = pygame.Color(f"#{tr.team_color}") if tr.team_color else (80, 80, 80)
-            pygame.draw.rect(surface, col, (10, y - 2, LEFT_PANEL_WIDTH - 20, 26), border_radius=6)
-
-        surface.blit(font.render(f"{pos}", True, C_GREY), (20, y))
+        surface.blit(render_cached(f"{pos}", C_GREY), (20, y))
         t = code + (f" {gap}" if pos > 1 else "")
-        surface.blit(font.render(t, True, C_WHITE), (55, y))
+        surface.blit(render_cached(t, C_WHITE), (55, y))
 
-        tyre = item["current_tyre"]
-        tcol = TYRE_COLORS.get(tyre, TYRE_COLORS["UNKNOWN"])
-        surface.blit(font.render(tyre[0], True, tcol), (190, y))
+        surface.blit(TYRE_LETTERS[item["tyre_code"]], (190, y))
 
         y += 30
 
 
-def draw_driver_info(screen, font, tr, idx):
+def draw_leaderboard(screen, rows_surface, ranked_data, selected_pos):
+    """Background + highlight of row `selected_pos` (None for none), with the cached text layer on top."""
+    screen.fill(C_BLACK, LEADERBOARD_RECT)
+
+    if selected_pos is not None:
+        tr = ranked_data[selected_pos]["trace"]
+        y = 60 + selected_pos * 30 - 2
+        pygame.draw.rect(screen, tr.team_rgb, (10, y, LEFT_PANEL_WIDTH - 20, 26), border_radius=6)
+
+    screen.blit(rows_surface, LEADERBOARD_RECT)
+
+
+def draw_driver_info(screen, tr, idx):
     x = WINDOW_WIDTH - RIGHT_PANEL_WIDTH + 10
     y = 60
 
-    color = pygame.Color(f"#{tr.team_color}") if tr.team_color else (80, 80, 80)
-    pygame.draw.rect(screen, color, (x, y, RIGHT_PANEL_WIDTH - 20, 40), border_radius=6)
+    pygame.draw.rect(screen, tr.team_rgb, (x, y, RIGHT_PANEL_WIDTH - 20, 40), border_radius=6)
 
-    title = pygame.font.SysFont("Arial", 24, bold=True)
-    screen.blit(title.render(tr.driver_code, True, C_WHITE), (x + 10, y + 5))
+    screen.blit(render_cached(tr.driver_code, C_WHITE, "driver_title"), (x + 10, y + 5))
 
     y += 60
 
@@ -353,59 +505,84 @@ def draw_driver_info(screen, font, tr, idx):
     gear = tr.gears[idx]
     drs_on = tr.drs[idx] >= 10
 
-    screen.blit(font.render(f"Speed: {int(speed)} km/h", True, C_WHITE), (x, y))
-    screen.blit(font.render(f"Gear: {gear}", True, C_WHITE), (x, y + 30))
+    screen.blit(render_cached(f"Speed: {int(speed)} km/h", C_WHITE), (x, y))
+    screen.blit(render_cached(f"Gear: {gear}", C_WHITE), (x, y + 30))
 
     screen.blit(
-        font.render("DRS: ON" if drs_on else "DRS: OFF",
-                    True, C_DRS_ON if drs_on else C_DRS_OFF),
+        render_cached("DRS: ON" if drs_on else "DRS: OFF",
+                      C_DRS_ON if drs_on else C_DRS_OFF),
         (x, y + 60)
     )
 
 
-def draw_lap_info(screen, font, tr, idx, total_laps):
+def draw_lap_info(screen, tr, idx, total_laps):
     x = LEFT_PANEL_WIDTH + 40
     y = WINDOW_HEIGHT - 40
 
     lap = tr.lap_numbers[idx]
     s1, s2, s3 = tr.sectors[idx]
 
-    screen.blit(font.render(f"LAP {lap}/{total_laps}", True, C_WHITE), (x, y))
-    screen.blit(font.render(f"S1: {s1:.3f}", True, C_YELLOW), (x + 150, y))
-    screen.blit(font.render(f"S2: {s2:.3f}", True, C_CYAN), (x + 300, y))
-    screen.blit(font.render(f"S3: {s3:.3f}", True, C_ORANGE), (x + 450, y))
+    screen.blit(render_cached(f"LAP {lap}/{total_laps}", C_WHITE), (x, y))
+    screen.blit(render_cached(f"S1: {s1:.3f}", C_YELLOW), (x + 150, y))
+    screen.blit(render_cached(f"S2: {s2:.3f}", C_CYAN), (x + 300, y))
+    screen.blit(render_cached(f"S3: {s3:.3f}", C_ORANGE), (x + 450, y))
 
 
-def draw_hud(screen, font, time, speed, paused, gp, circuit):
+def draw_hud(screen, time, speed, paused, gp, circuit):
+    # Shown at 0.1s resolution, so the label is only re-rendered when it changes
     status = "PAUSED" if paused else f"{speed:.1f}x"
-    screen.blit(font.render(f"Time: {time:.1f}s | Speed: {status}", True, C_WHITE),
+    screen.blit(render_cached(f"Time: {time:.1f}s | Speed: {status}", C_WHITE),
                 (LEFT_PANEL_WIDTH + 40, 20))
 
-    tfont = pygame.font.SysFont("Arial", 22, bold=True)
-    text = tfont.render(f"{gp}: {circuit}", True, C_WHITE)
+    text = render_cached(f"{gp}: {circuit}", C_WHITE, "hud_title")
     screen.blit(text, (WINDOW_WIDTH / 2 - text.get_width() / 2, 20))
 
 
-def draw_track_and_cars(screen, centerline, markers, traces, indices, bounds):
-    pygame.draw.aalines(screen, C_WHITE, True, centerline, 2)
+def make_car_dot(color) -> pygame.Surface:
+    """Car marker (black outline + team color) rendered once per driver."""
+    dot = pygame.Surface((12, 12), pygame.SRCALPHA)
+    pygame.draw.circle(dot, (0, 0, 0), (6, 6), 6)
+    pygame.draw.circle(dot, color, (6, 6), 5)
+    return dot.convert_alpha()
+
+
+def blit_many(surface, items):
+    """One batched blit call; fblits on pygame-ce, blits otherwise."""
+    fblits = getattr(surface, "fblits", None)
+    if fblits is not None:
+        fblits(items)
+    else:
+        surface.blits(items, doreturn=False)
+
+
+def render_track_background(centerline, markers) -> pygame.Surface:
+    """Everything that does not move (track line, sector markers), drawn once."""
+    bg = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    bg.fill(C_BLACK)
+
+    pygame.draw.aalines(bg, C_WHITE, True, centerline, 2)
+
+    f = FONTS["marker"]
+    pygame.draw.circle(bg, C_YELLOW, markers["s1_line"], 8)
+    pygame.draw.circle(bg, C_CYAN, markers["s2_line"], 8)
+    pygame.draw.circle(bg, C_ORANGE, markers["s3_line"], 8)
 
-    f = pygame.font.SysFont("Arial", 16, bold=True)
-    pygame.draw.circle(screen, C_YELLOW, markers["s1_line"], 8)
-    pygame.draw.circle(screen, C_CYAN, markers["s2_line"], 8)
-    pygame.draw.circle(screen, C_ORANGE, markers["s3_line"], 8)
+    bg.blit(f.render("S1", True, C_YELLOW), markers["s1_label_pos"])
+    bg.blit(f.render("S2", True, C_CYAN), markers["s2_label_pos"])
+    bg.blit(f.render("S3", True, C_ORANGE), markers["s3_label_pos"])
+    return bg
 
-    screen.blit(f.render("S1", True, C_YELLOW), markers["s1_label_pos"])
-    screen.blit(f.render("S2", True, C_CYAN), markers["s2_label_pos"])
-    screen.blit(f.render("S3", True, C_ORANGE), markers["s3_label_pos"])
 
-    for code, tr in traces.items():
-        idx = indices[code]
-        x, y = tr.positions[idx]
-        sx, sy = world_to_screen(x, y, bounds)
+def draw_cars(screen, traces, indices, projector) -> List[pygame.Rect]:
+    """Draws every car and returns the screen rects they cover."""
+    xs = numpy.array([tr.xs[indices[code]] for code, tr in traces.items()])
+    ys = numpy.array([tr.ys[indices[code]] for code, tr in traces.items()])
+    corners = (projector.to_screen_batch(xs, ys) - 6).tolist()
 
-        color = pygame.Color(f"#{tr.team_color}") if tr.team_color else C_GREY
-        pygame.draw.circle(screen, (0, 0, 0), (sx, sy), 6)
-        pygame.draw.circle(screen, color, (sx, sy), 5)
+    dots = [(tr.dot_surface, tuple(pos)) for tr, pos in zip(traces.values(), corners)]
+
+    blit_many(screen, dots)
+    return [pygame.Rect(pos, (12, 12)) for _, pos in dots]
 
 
 def draw_loading(screen, font, msg):
@@ -424,32 +601,30 @@ def run_replay(year=2025, round_number=1, gp_name="", circuit_name=""):
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption(f"F1 Replay: {year} {gp_name}")
 
-    font = pygame.font.SysFont("Arial", 18)
+    load_fonts()
+    font = FONTS["main"]
     clock = pygame.time.Clock()
 
     draw_loading(screen, font, f"Loading telemetry for {gp_name}...")
 
-    try:
-        os.makedirs("f1_cache", exist_ok=True)
-        fastf1.Cache.enable_cache("f1_cache")
-    except:
-        pass
-
     data = {"traces": None, "colors": {}, "total_laps": 0}
 
     def loader():
         try:
-            session = fastf1.get_session(year, round_number, "R")
-            session.load(laps=True, telemetry=True)
+            session = get_session(year, round_number)
 
             data["total_laps"] = int(session.laps["LapNumber"].max())
 
-            drivers = session.drivers
+            # Slice the session here, then do the CPU-bound pandas work in
+            # worker processes (threads would serialize on the GIL)
+            jobs = [job for job in (prepare_driver(session, d) for d in session.drivers) if job]
             traces = {}
             colors = {}
 
-            with ThreadPoolExecutor() as pool:
-                for code, tr, col in pool.map(lambda d: process_driver(session, d), drivers):
+            # Never fork this process: it is multi-threaded and holds SDL state
+            with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=worker_context()) as pool:
+                futures = [pool.submit(process_driver, *job) for job in jobs]
+                for code, tr, col in (f.result() for f in futures):
                     if code and tr:
                         traces[code] = tr
                         colors[code] = col
@@ -463,12 +638,13 @@ def run_replay(year=2025, round_number=1, gp_name="", circuit_name=""):
     th = threading.Thread(target=loader)
     th.start()
 
+    # Keep the window responsive; join() returns as soon as loading finishes
     while th.is_alive():
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
                 pygame.quit()
                 return
-        clock.tick(10)
+        th.join(0.05)
 
     traces = data["traces"]
     if not traces:
@@ -480,21 +656,38 @@ def run_replay(year=2025, round_number=1, gp_name="", circuit_name=""):
         if code in traces:
             traces[code].team_color = col
 
-    bounds = compute_bounds(traces)
-    centerline, markers = build_track_geometry(traces, bounds)
+    # Parse team colors once; panels fall back to dark grey, car dots to light grey
+    for tr in traces.values():
+        tr.team_rgb = pygame.Color(f"#{tr.team_color}") if tr.team_color else pygame.Color(80, 80, 80)
+        tr.dot_surface = make_car_dot(tr.team_rgb if tr.team_color else C_GREY)
+
+    projector, centerline, markers = load_track_geometry(year, round_number, traces)
+    track_bg = render_track_background(centerline, markers)
 
-    min_time = min(tr.times[0] for tr in traces.values() if tr.times)
-    max_time = max(tr.times[-1] for tr in traces.values() if tr.times)
+    first_times = numpy.array([tr.times[0] for tr in traces.values() if len(tr.times)])
+    last_times = numpy.array([tr.times[-1] for tr in traces.values() if len(tr.times)])
+    min_time = float(first_times.min())
+    max_time = float(last_times.max())
 
+    time_index = build_time_index(traces)
     indices = {code: 0 for code in traces}
     current_time = min_time
     speed = 1.0
     paused = False
 
-    order = compute_ranking_data(traces, indices)
-    selected = order[0]["code"] if order else next(iter(traces))
+    ranking = compute_ranking_data(traces, indices)
+    ranked_indices = dict(indices)
+    selected = ranking[0]["code"] if ranking else next(iter(traces))
+    # Row of the selected driver in `ranking`, kept in step with it
+    selected_pos = 0 if ranking else None
+
+    lb_rows = pygame.Surface((LEFT_PANEL_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA).convert_alpha()
+    drawn_lb_rows = None
+    drawn_lb_state = None
+    car_rects = None  # None until the first full frame has been drawn
 
-    lb_surface = pygame.Surface((LEFT_PANEL_WIDTH, WINDOW_HEIGHT))
+    # Restart the frame clock so the first dt does not include the load time
+    clock.tick()
 
     running = True
     while running:
@@ -504,6 +697,11 @@ def run_replay(year=2025, round_number=1, gp_name="", circuit_name=""):
             if ev.type == pygame.QUIT:
                 running = False
 
+            # Window contents were lost; repaint everything next frame
+            if ev.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                car_rects = None
+                drawn_lb_state = None
+
             if ev.type == pygame.KEYDOWN:
 
                 if ev.key == pygame.K_SPACE:
@@ -521,19 +719,11 @@ def run_replay(year=2025, round_number=1, gp_name="", circuit_name=""):
                 elif ev.key == pygame.K_LEFT:
                     current_time = max(min_time, current_time - 5)
 
-                elif ev.key == pygame.K_LEFTBRACKET:
-                    rank = compute_ranking_data(traces, indices)
-                    arr = [d["code"] for d in rank]
-                    if selected in arr:
-                        i = arr.index(selected)
-                        selected = arr[(i - 1) % len(arr)]
-
-                elif ev.key == pygame.K_RIGHTBRACKET:
-                    rank = compute_ranking_data(traces, indices)
-                    arr = [d["code"] for d in rank]
-                    if selected in arr:
-                        i = arr.index(selected)
-                        selected = arr[(i + 1) % len(arr)]
+                # Step through the ranking currently on screen
+                elif ev.key in (pygame.K_LEFTBRACKET, pygame.K_RIGHTBRACKET) and selected_pos is not None:
+                    step = -1 if ev.key == pygame.K_LEFTBRACKET else 1
+                    selected_pos = (selected_pos + step) % len(ranking)
+                    selected = ranking[selected_pos]["code"]
 
         if not paused:
             current_time += dt * speed
@@ -541,26 +731,50 @@ def run_replay(year=2025, round_number=1, gp_name="", circuit_name=""):
                 current_time = max_time
                 paused = True
 
-        for code, tr in traces.items():
-            idx = bisect.bisect_right(tr.times, current_time)
-            indices[code] = max(0, idx - 1)
-
-        screen.fill(C_BLACK)
+        # Latest sample at or before current_time; stateless, so seeking works
+        indices = dict(zip(time_index.codes, time_index.lookup(current_time).tolist()))
 
-        draw_track_and_cars(screen, centerline, markers, traces, indices, bounds)
-
-        ranking = compute_ranking_data(traces, indices)
-        draw_leaderboard(lb_surface, ranking, font, selected)
-        screen.blit(lb_surface, (0, 0))
+        # Only regions that can change are erased, redrawn and pushed to the display
+        if car_rects is None:
+            screen.blit(track_bg, (0, 0))
+            dirty = [screen.get_rect()]
+            car_rects = []
+        else:
+            dirty = car_rects + [HUD_RECT, LAP_INFO_RECT, DRIVER_INFO_RECT]
+            for rect in dirty:
+                screen.blit(track_bg, rect, rect)
+
+        car_rects = draw_cars(screen, traces, indices, projector)
+        dirty.extend(car_rects)
+
+        # Order and gaps only change when some car moved to a new sample
+        # (never while paused, and not between samples at 60 fps)
+        if indices != ranked_indices:
+            ranking = compute_ranking_data(traces, indices)
+            ranked_indices = dict(indices)
+            selected_pos = next((i for i, r in enumerate(ranking) if r["code"] == selected), None)
+        # Redraw the leaderboard only when its rows or the selection change.
+        # The text layer only changes with the rows; a new selection
+        # just moves the highlight underneath it
+        lb_rows_state = [(r["code"], r["gap_to_ahead"], r["tyre_code"]) for r in ranking]
+        if lb_rows_state != drawn_lb_rows:
+            draw_leaderboard_rows(lb_rows, ranking)
+            drawn_lb_rows = lb_rows_state
+
+        lb_state = (lb_rows_state, selected_pos)
+        if lb_state != drawn_lb_state:
+            draw_leaderboard(screen, lb_rows, ranking, selected_pos)
+            drawn_lb_state = lb_state
+            dirty.append(LEADERBOARD_RECT)
 
         tr = traces[selected]
         idx = indices[selected]
 
-        draw_driver_info(screen, font, tr, idx)
-        draw_lap_info(screen, font, tr, idx, data["total_laps"])
+        draw_driver_info(screen, tr, idx)
+        draw_lap_info(screen, tr, idx, data["total_laps"])
 
-        draw_hud(screen, font, current_time - min_time, speed, paused, gp_name, circuit_name)
+        draw_hud(screen, current_time - min_time, speed, paused, gp_name, circuit_name)
 
-        pygame.display.flip()
+        pygame.display.update(dirty)
 
     pygame.quit()